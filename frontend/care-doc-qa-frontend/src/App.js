@@ -31,16 +31,25 @@ function App() {
   // API BASE URL
   const API_BASE = '';
 
+  // Counter keeps ids unique when several messages are added within the same millisecond
+  const messageCounter = useRef(0);
+
   // Add message to chat interface
   const addMessage = useCallback((type, content, metadata = null) => {
     const newMessage = {
-      id: Date.now(),
+      id: `${Date.now()}-${messageCounter.current++}`,
       type, // 'user', 'ai', 'system', 'analysis'
       content,
       metadata,
       timestamp: new Date().toLocaleTimeString()
     };
     setMessages(prev => [...prev, newMessage]);
+    return newMessage.id;
+  }, []);
+
+  // Update an existing chat message in place (used while an answer streams in)
+  const updateMessage = useCallback((id, update) => {
+    setMessages(prev => prev.map(msg => (msg.id === id ? { ...msg, ...update(msg) } : msg)));
   }, []);
 
   // System health monitoring
@@ -116,8 +125,61 @@ Try asking: "What should I do if someone falls repeatedly?"`);
         };
       }
 
-      const response = await axios.post(`${API_BASE}/chat`, requestPayload);
-      const data = response.data;
+      // Stream the reply so policy answers render as they are generated
+      const response = await fetch(`${API_BASE}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(requestPayload)
+      });
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.error || `Request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let streamingId = null;
+      let data = null;
+
+      while (!data) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-sent events are separated by a blank line
+        let boundary;
+        while (!data && (boundary = buffer.indexOf('\n\n')) !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+
+          let event = 'message';
+          let payload = '';
+          frame.split('\n').forEach(line => {
+            if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) payload += line.slice(6);
+          });
+          const eventData = JSON.parse(payload);
+
+          if (event === 'delta') {
+            if (streamingId === null) {
+              streamingId = addMessage('ai', eventData.content);
+              setIsLoading(false); // Text is arriving; let the user read it
+            } else {
+              updateMessage(streamingId, msg => ({ content: msg.content + eventData.content }));
+            }
+          } else if (event === 'error') {
+            throw new Error(eventData.error);
+          } else if (event === 'done') {
+            data = eventData;
+          }
+        }
+      }
+      reader.cancel();
+
+      if (!data) {
+        throw new Error('Chat stream ended unexpectedly');
+      }
       
       if (data.type === 'transcript_analysis') {
         // Handle transcript analysis response
@@ -138,11 +200,16 @@ Try asking: "What should I do if someone falls repeatedly?"`);
         });
       } else {
         // Handle policy question response (including contextual follow-ups)
-        addMessage('ai', data.message, {
+        const metadata = {
           tokens: data.tokens_used,
           cost: data.cost,
           type: data.type || 'policy_question'
-        });
+        };
+        if (streamingId !== null) {
+          updateMessage(streamingId, () => ({ content: data.message, metadata }));
+        } else {
+          addMessage('ai', data.message, metadata);
+        }
       }
 
       // Update total cost
@@ -152,11 +219,11 @@ Try asking: "What should I do if someone falls repeatedly?"`);
 
     } catch (error) {
       console.error('Chat failed:', error);
-      addMessage('system', `Error: ${error.response?.data?.error || error.message}`);
+      addMessage('system', `Error: ${error.message}`);
     } finally {
       setIsLoading(false);
     }
-  }, [message, addMessage, API_BASE, totalCost, sessionContext]);
+  }, [message, addMessage, updateMessage, API_BASE, totalCost, sessionContext]);
 
   const analyzeTranscript = useCallback(async () => {
     if (!transcript.trim()) {
@@ -44,6 +44,7 @@ echo -e "\n${YELLOW}⏳ Killing CareDocQA-related processes...${NC}"
 # Python services
 pkill -f "python.*app.py" 2>/dev/null && echo -e "${GREEN}✅ Killed Python services${NC}" || true
 pkill -f "services/.*app.py" 2>/dev/null || true
+pkill -f "gunicorn.*app:app" 2>/dev/null && echo -e "${GREEN}✅ Killed Gunicorn workers${NC}" || true
 
 # React dev server
 pkill -f "react-scripts start" 2>/dev/null && echo -e "${GREEN}✅ Killed React dev server${NC}" || true
@@ -1,24 +1,104 @@
 import os
-import requests
+import re
+import time
+import uuid
+import asyncio
+import httpx
+import orjson
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, Optional
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; records are written by a background listener thread
+# so handler I/O never blocks the event loop. The queue handler is attached
+# in the lifespan, next to the listener that drains it, so a module imported
+# twice (python app.py re-imports it as 'app') can't log into an undrained queue.
+# Only the console handler formats; the queue handler passes plain messages.
+log_queue = queue.SimpleQueue()
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+queue_handler = QueueHandler(log_queue)
+log_listener = QueueListener(log_queue, console_handler)
+logging.getLogger().setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Service configuration
+INCIDENT_PROCESSOR_URL = os.getenv('INCIDENT_PROCESSOR_URL', 'http://localhost:5001')
+SERVICE_TIMEOUT = 60  # Longer timeout for AI processing
+HEALTH_TIMEOUT = 5  # Health probes should fail fast
+
+# Worker processes started by `python app.py`
+GATEWAY_WORKERS = int(os.getenv('WORKERS', '1'))
+
+# Background transcript analyses live in this process, so job polling
+# requires the gateway to run as a single worker (the default); with more
+# workers, job submissions are refused rather than polled on the wrong worker
+ANALYSIS_JOBS_ENABLED = GATEWAY_WORKERS == 1
+ANALYSIS_JOB_TTL = 3600  # Seconds a finished job's result stays available
+# Jobs wait in a bounded queue and a fixed pool of runners works through them,
+# so a burst of submissions doesn't become a burst of concurrent /analyze calls
+ANALYSIS_JOB_CONCURRENCY = int(os.getenv('ANALYSIS_JOB_CONCURRENCY', '2'))
+ANALYSIS_JOB_QUEUE_SIZE = int(os.getenv('ANALYSIS_JOB_QUEUE_SIZE', '100'))
+analysis_jobs: Dict[str, Dict[str, Any]] = {}
+
+# Keywords that mark a chat message as a call transcript, matched in a single case-insensitive pass
+TRANSCRIPT_KEYWORDS_RE = re.compile(
+    r"transcript|telephone call|greg jones|julie peaterson|fallen again|on the floor|living room",
+    re.IGNORECASE
+)
+
+# Incident processor health endpoints probed concurrently by /health, keyed by the
+# name each result is reported under. Probes go through call_incident_processor
+# (its URL and circuit breaker), so another service would need its own client
+INCIDENT_PROCESSOR_HEALTH_PROBES = {
+    'incident_processor': '/health',
+}
+
+# Disable proxy buffering/compression so each event reaches the browser as it's written
+SSE_HEADERS = {'Cache-Control': 'no-cache, no-transform', 'X-Accel-Buffering': 'no'}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Share one pooled async HTTP client across all downstream calls
+    """
+    root_logger = logging.getLogger()
+    root_logger.addHandler(queue_handler)
+    log_listener.start()
+    app.state.http_client = httpx.AsyncClient(
+        base_url=INCIDENT_PROCESSOR_URL,
+        timeout=SERVICE_TIMEOUT,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60)
+    )
+    app.state.analysis_queue = asyncio.Queue(maxsize=ANALYSIS_JOB_QUEUE_SIZE)
+    runners = [asyncio.create_task(analysis_job_runner(app.state.analysis_queue)) for _ in range(ANALYSIS_JOB_CONCURRENCY)]
+    if not ANALYSIS_JOBS_ENABLED:
+        logger.warning("Analysis jobs are disabled: job state is per process and WORKERS=%d", GATEWAY_WORKERS)
+    yield
+    for runner in runners:
+        runner.cancel()
+    await asyncio.gather(*runners, return_exceptions=True)
+    await app.state.http_client.aclose()
+    root_logger.removeHandler(queue_handler)
+    log_listener.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Incident Response API Gateway",
     description="AI-Enhanced Social Care Incident Response System",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware for React frontend
@@ -30,10 +110,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Service configuration
-INCIDENT_PROCESSOR_URL = os.getenv('INCIDENT_PROCESSOR_URL', 'http://localhost:5001')
-SERVICE_TIMEOUT = 60  # Longer timeout for AI processing
-
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
@@ -47,51 +123,125 @@ class DocumentUpdateRequest(BaseModel):
     document_type: str
     current_content: str
     all_documents: Dict[str, Any]
+    batch_mode: bool = False  # Queue on OpenAI's half-price Batch API instead of answering now
+
+@dataclass
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker that fast-fails calls to a failing service
+    """
+    threshold: int = 5
+    cooldown: float = 30.0
+    failures: int = 0
+    opened_at: float = 0.0
+    state: str = 'closed'
+    
+    def allow_request(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        # Cooldown elapsed: let one trial request through and hold the rest for another cooldown
+        self.state = 'half_open'
+        self.opened_at = time.monotonic()
+        return True
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self.state = 'closed'
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.threshold:
+            self.state = 'open'
+            self.opened_at = time.monotonic()
 
-def call_incident_processor(endpoint: str, method: str = 'GET', **kwargs) -> Dict[str, Any]:
+incident_processor_breaker = CircuitBreaker()
+
+# Responses that mean the processor itself is down or overloaded (with timeouts
+# and connection errors); application errors don't count against the breaker
+BREAKER_FAILURE_STATUSES = {502, 503, 504}
+
+async def call_incident_processor(endpoint: str, method: str = 'GET', timeout: float = SERVICE_TIMEOUT, raw: bool = False, **kwargs) -> Dict[str, Any]:
     """
     Call the incident processor service with error handling
+
+    With raw=True a successful response is returned as undecoded bytes so
+    pure proxy endpoints can forward it without a parse/re-encode round trip
     """
     url = f"{INCIDENT_PROCESSOR_URL}{endpoint}"
     
+    if not incident_processor_breaker.allow_request():
+        logger.warning("Incident processor circuit open, failing fast")
+        raise HTTPException(
+            status_code=503,
+            detail="Incident processor circuit open"
+        )
+    
     try:
-        logger.info(f"Calling incident processor: {method} {url}")
+        logger.info("Calling incident processor: %s %s", method, url)
         
-        if method.upper() == 'GET':
-            response = requests.get(url, timeout=SERVICE_TIMEOUT, **kwargs)
-        elif method.upper() == 'POST':
-            response = requests.post(url, timeout=SERVICE_TIMEOUT, **kwargs)
-        else:
+        if method.upper() not in ('GET', 'POST'):
             raise HTTPException(status_code=500, detail=f"Unsupported HTTP method: {method}")
         
-        logger.info(f"Incident processor responded with status {response.status_code}")
+        response = await app.state.http_client.request(method.upper(), endpoint, timeout=timeout, **kwargs)
+        
+        logger.info("Incident processor responded with status %s", response.status_code)
         
-        if response.status_code >= 500:
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            incident_processor_breaker.record_failure()
             raise HTTPException(
                 status_code=502, 
                 detail=f"Incident processor error: {response.status_code}"
             )
         
+        # Anything else means the processor is up, including its own 500s for
+        # failed OpenAI calls, which are passed back to the caller as errors
+        incident_processor_breaker.record_success()
+        
+        if raw and 200 <= response.status_code < 300:
+            return {
+                'status_code': response.status_code,
+                'raw_bytes': response.content,
+                'content_type': response.headers.get('content-type', 'application/json'),
+                'success': True
+            }
+        
+        # The incident processor always answers in JSON; fall back to text for anything else
+        try:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            data = response.text
+        
+        # A 429 from the processor's rate limiter says when to retry; keep that for the client
+        retry_after = response.headers.get('retry-after')
+        
         return {
             'status_code': response.status_code,
-            'data': response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text,
+            'data': data,
+            'headers': {'Retry-After': retry_after} if retry_after else None,
             'success': 200 <= response.status_code < 300
         }
         
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
+        incident_processor_breaker.record_failure()
         logger.error("Timeout calling incident processor service")
         raise HTTPException(
             status_code=504, 
             detail="Incident processor service timeout"
         )
-    except requests.exceptions.ConnectionError:
+    except httpx.TransportError:
+        incident_processor_breaker.record_failure()
         logger.error("Connection error to incident processor service")
         raise HTTPException(
             status_code=503, 
             detail="Incident processor service unavailable"
         )
-    except Exception as e:
-        logger.error(f"Unexpected error calling incident processor: {e}")
+    except HTTPException:
+        # Already carries the right status (502 upstream error, unsupported method)
+        raise
+    except (ValueError, httpx.HTTPError) as e:
+        logger.error("Unexpected error calling incident processor: %s", e)
         raise HTTPException(
             status_code=500, 
             detail="Internal error calling incident processor"
@@ -102,101 +252,138 @@ async def health_check() -> Dict[str, Any]:
     """
     System health check including incident processor service
     """
+    now = datetime.now().isoformat()
     health_status = {
         'api_gateway': {
             'status': 'healthy',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now
         }
     }
     
     overall_healthy = True
     
-    # Check incident processor health
-    try:
-        result = call_incident_processor('/health', 'GET')
-        health_status['incident_processor'] = result['data']
+    # Run the probes at once so latency is the slowest probe, not the sum
+    results = await asyncio.gather(
+        *(call_incident_processor(endpoint, 'GET', timeout=HEALTH_TIMEOUT) for endpoint in INCIDENT_PROCESSOR_HEALTH_PROBES.values()),
+        return_exceptions=True
+    )
+    
+    for probe_name, result in zip(INCIDENT_PROCESSOR_HEALTH_PROBES, results):
+        if isinstance(result, Exception):
+            health_status[probe_name] = {
+                'status': 'unhealthy',
+                'error': result.detail if isinstance(result, HTTPException) else str(result),
+                'timestamp': now
+            }
+            overall_healthy = False
+            continue
+        
+        health_status[probe_name] = result['data']
         if not result['success']:
             overall_healthy = False
-    except Exception as e:
-        health_status['incident_processor'] = {
-            'status': 'unhealthy',
-            'error': str(e),
-            'timestamp': datetime.now().isoformat()
-        }
-        overall_healthy = False
     
     # Overall system status
     health_status['overall'] = {
         'status': 'healthy' if overall_healthy else 'degraded',
         'system': 'incident_response',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now
     }
     
     status_code = 200 if overall_healthy else 503
-    return JSONResponse(content=health_status, status_code=status_code)
+    return ORJSONResponse(content=health_status, status_code=status_code)
+
+@dataclass
+class ChatRoute:
+    """
+    How a chat message is handled: the processor payload and the response type reported back
+    """
+    is_transcript: bool
+    request_data: Dict[str, Any]
+    response_type: str
+
+def route_chat_message(request: ChatRequest) -> ChatRoute:
+    """
+    Decide whether a chat message is a transcript or a policy question;
+    shared by /chat and /chat/stream so the two can't drift apart
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Processing chat message: %s...", request.message[:50])
+    
+    message = request.message.strip()
+    
+    # Simple heuristic: if message is very long or contains specific keywords, treat as transcript
+    is_transcript = (
+        len(message) > 500 or  # Long message likely to be transcript
+        TRANSCRIPT_KEYWORDS_RE.search(message) is not None
+    )
+    if is_transcript:
+        return ChatRoute(True, {'transcript': message}, 'transcript_analysis')
+    
+    # Process as policy question (potentially with context)
+    request_data = {'question': message}
+    
+    # Include session context for follow-up questions
+    if request.session_context and request.session_context.get('has_active_incident'):
+        request_data['session_context'] = request.session_context
+    
+    response_type = 'contextual_followup' if request.session_context else 'policy_question'
+    return ChatRoute(False, request_data, response_type)
 
 @app.post("/chat")
 async def chat_about_policies(request: ChatRequest) -> Dict[str, Any]:
     """
     Chat endpoint for policy questions and general interaction
     """
-    logger.info(f"Processing chat message: {request.message[:50]}...")
-    
+    return await answer_chat_message(route_chat_message(request))
+
+async def answer_chat_message(route: ChatRoute) -> Dict[str, Any]:
+    """
+    Answer a routed chat message in one response, as /chat returns it
+    """
     try:
-        # Determine if this is a transcript or a question
-        message = request.message.strip()
-        
-        # Simple heuristic: if message is very long or contains specific keywords, treat as transcript
-        is_transcript = (
-            len(message) > 500 or  # Long message likely to be transcript
-            any(keyword in message.lower() for keyword in [
-                'transcript', 'telephone call', 'greg jones', 'julie peaterson',
-                'fallen again', 'on the floor', 'living room'
-            ])
-        )
-        
-        if is_transcript:
+        if route.is_transcript:
             # Process as transcript analysis
-            result = call_incident_processor(
+            result = await call_incident_processor(
                 '/analyze',
                 'POST',
-                json={'transcript': message}
+                json=route.request_data
             )
             
             if result['success']:
                 # Format response for chat interface
                 analysis_data = result['data']['analysis']
                 
-                chat_response = f"""📋 **INCIDENT ANALYSIS**
+                # Collect the sections and join once rather than re-copying the string per line
+                parts = [f"""📋 **INCIDENT ANALYSIS**
 
 **Summary:** {analysis_data['analysis']['summary']}
 
 **🚨 TRIGGERED POLICIES:**
-"""
+"""]
                 
                 for policy in analysis_data['analysis']['triggered_policies']:
-                    chat_response += f"• **{policy['section']}**: {policy['reason']}\n"
+                    parts.append(f"• **{policy['section']}**: {policy['reason']}\n")
                 
-                chat_response += f"""
+                parts.append("""
 **📝 REQUIRED ACTIONS:**
-"""
+""")
                 for action in analysis_data['analysis']['required_actions']:
-                    chat_response += f"• {action}\n"
+                    parts.append(f"• {action}\n")
                 
-                chat_response += f"""
+                parts.append("""
 **📋 INCIDENT REPORT:**
-"""
+""")
                 # Format incident report as a clean list instead of raw JSON
                 for field, value in analysis_data['incident_report'].items():
-                    chat_response += f"• **{field}**: {value}\n"
+                    parts.append(f"• **{field}**: {value}\n")
                 
-                chat_response += f"""
+                parts.append("""
 **📧 EMAILS TO SEND:**
-"""
+""")
                 
                 for email in analysis_data['emails']:
                     cc_info = f"CC: {', '.join(email['cc'])}" if email.get('cc') and email['cc'] else ""
-                    chat_response += f"""
+                    parts.append(f"""
 **To: {email['recipient_type'].upper()}**
 Subject: {email['subject']}
 Urgency: {email['urgency'].upper()}
@@ -205,12 +392,14 @@ Urgency: {email['urgency'].upper()}
 {email['body']}
 
 ---
-"""
+""")
+                
+                chat_response = "".join(parts)
                 
                 return {
                     'success': True,
                     'message': chat_response,
-                    'type': 'transcript_analysis',
+                    'type': route.response_type,
                     'analysis_data': analysis_data,
                     'tokens_used': result['data'].get('tokens_used', 0),
                     'cost': result['data'].get('cost', 0)
@@ -218,144 +407,385 @@ Urgency: {email['urgency'].upper()}
             else:
                 raise HTTPException(
                     status_code=result['status_code'],
-                    detail=result['data'].get('error', 'Transcript analysis failed')
+                    detail=result['data'].get('error', 'Transcript analysis failed'),
+                    headers=result.get('headers')
                 )
         
         else:
-            # Process as policy question (potentially with context)
-            request_data = {'question': message}
-            
-            # Include session context for follow-up questions
-            if request.session_context and request.session_context.get('has_active_incident'):
-                request_data['session_context'] = request.session_context
-                
-            result = call_incident_processor(
+            result = await call_incident_processor(
                 '/chat',
                 'POST',
-                json=request_data
+                json=route.request_data
             )
             
             if result['success']:
-                response_type = 'contextual_followup' if request.session_context else 'policy_question'
                 return {
                     'success': True,
                     'message': result['data']['answer'],
-                    'type': response_type,
+                    'type': route.response_type,
                     'tokens_used': result['data'].get('tokens_used', 0),
                     'cost': result['data'].get('cost', 0)
                 }
             else:
                 raise HTTPException(
                     status_code=result['status_code'],
-                    detail=result['data'].get('error', 'Policy question failed')
+                    detail=result['data'].get('error', 'Policy question failed'),
+                    headers=result.get('headers')
                 )
                 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Chat processing error: {e}")
+        logger.error("Chat processing error: %s", e)
         raise HTTPException(status_code=500, detail="Chat processing failed")
 
+def sse_event(event: str, data: Any) -> bytes:
+    """
+    Format one server-sent event frame
+    """
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+async def stream_policy_events(request_data: Dict[str, Any], response_type: str):
+    """
+    Relay the incident processor's answer stream, reshaping its final event into a /chat payload
+    """
+    if not incident_processor_breaker.allow_request():
+        logger.warning("Incident processor circuit open, failing fast")
+        yield sse_event('error', {'success': False, 'error': 'Incident processor circuit open'})
+        return
+    
+    try:
+        async with app.state.http_client.stream('POST', '/chat/stream', json=request_data) as response:
+            if response.status_code in BREAKER_FAILURE_STATUSES:
+                incident_processor_breaker.record_failure()
+                yield sse_event('error', {'success': False, 'error': f"Incident processor error: {response.status_code}"})
+                return
+            
+            incident_processor_breaker.record_success()
+            
+            if response.status_code != 200:
+                await response.aread()
+                yield sse_event('error', {'success': False, 'error': orjson.loads(response.content).get('error', 'Policy question failed')})
+                return
+            
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith('event: '):
+                    event = line[len('event: '):]
+                elif line.startswith('data: '):
+                    data = orjson.loads(line[len('data: '):])
+                    if event == 'done':
+                        yield sse_event('done', {
+                            'success': True,
+                            'message': data['answer'],
+                            'type': response_type,
+                            'tokens_used': data.get('tokens_used', 0),
+                            'cost': data.get('cost', 0)
+                        })
+                    else:
+                        # Deltas and errors already have the shape the frontend expects
+                        yield sse_event(event, data)
+                        
+    except httpx.TimeoutException:
+        incident_processor_breaker.record_failure()
+        logger.error("Timeout streaming from incident processor service")
+        yield sse_event('error', {'success': False, 'error': 'Incident processor service timeout'})
+    except httpx.TransportError:
+        incident_processor_breaker.record_failure()
+        logger.error("Connection error to incident processor service")
+        yield sse_event('error', {'success': False, 'error': 'Incident processor service unavailable'})
+    except (ValueError, httpx.HTTPError) as e:
+        logger.error("Unexpected error streaming from incident processor: %s", e)
+        yield sse_event('error', {'success': False, 'error': 'Chat processing failed'})
+
+@app.post("/chat/stream")
+async def stream_chat(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming variant of /chat: policy answers arrive as `delta` events while they are
+    generated, followed by a `done` event with the same payload /chat would return
+    """
+    route = route_chat_message(request)
+    
+    if route.is_transcript:
+        # Analysis output is one JSON document, so it is delivered whole once ready
+        async def transcript_events():
+            try:
+                yield sse_event('done', await answer_chat_message(route))
+            except HTTPException as e:
+                yield sse_event('error', {'success': False, 'error': e.detail})
+        
+        events = transcript_events()
+    else:
+        events = stream_policy_events(route.request_data, route.response_type)
+    
+    return StreamingResponse(events, media_type='text/event-stream', headers=SSE_HEADERS)
+
 @app.post("/analyze")
 async def analyze_transcript(request: TranscriptAnalysisRequest) -> Dict[str, Any]:
     """
     Direct transcript analysis endpoint
     """
-    logger.info(f"Processing transcript analysis: {len(request.transcript)} characters")
+    logger.info("Processing transcript analysis: %d characters", len(request.transcript))
     
     try:
-        result = call_incident_processor(
+        result = await call_incident_processor(
             '/analyze',
             'POST',
+            raw=True,
             json={'transcript': request.transcript}
         )
         
         if result['success']:
-            return result['data']
+            return Response(
+                content=result['raw_bytes'],
+                media_type=result['content_type'],
+                status_code=result['status_code']
+            )
         else:
             raise HTTPException(
                 status_code=result['status_code'],
-                detail=result['data'].get('error', 'Transcript analysis failed')
+                detail=result['data'].get('error', 'Transcript analysis failed'),
+                headers=result.get('headers')
             )
             
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Transcript analysis error: {e}")
+        logger.error("Transcript analysis error: %s", e)
         raise HTTPException(status_code=500, detail="Transcript analysis failed")
 
+async def run_analysis_job(job_id: str, transcript: str) -> None:
+    """
+    Run a queued transcript analysis and record its outcome on the job
+    """
+    job = analysis_jobs[job_id]
+    job['state'] = 'running'
+    
+    try:
+        result = await call_incident_processor(
+            '/analyze',
+            'POST',
+            json={'transcript': transcript}
+        )
+        
+        if result['success']:
+            job['state'] = 'succeeded'
+            job['result'] = result['data']
+        else:
+            job['state'] = 'failed'
+            job['error'] = result['data'].get('error', 'Transcript analysis failed')
+            
+    except HTTPException as e:
+        job['state'] = 'failed'
+        job['error'] = e.detail
+    except Exception as e:
+        logger.error("Analysis job %s error: %s", job_id, e)
+        job['state'] = 'failed'
+        job['error'] = 'Transcript analysis failed'
+    finally:
+        job['finished_at'] = time.monotonic()
+
+async def analysis_job_runner(queue: asyncio.Queue) -> None:
+    """
+    Take queued analysis jobs one at a time until cancelled at shutdown
+    """
+    while True:
+        job_id, transcript = await queue.get()
+        try:
+            await run_analysis_job(job_id, transcript)
+        finally:
+            queue.task_done()
+
+def prune_analysis_jobs() -> None:
+    """
+    Drop finished jobs whose results have outlived ANALYSIS_JOB_TTL
+    """
+    cutoff = time.monotonic() - ANALYSIS_JOB_TTL
+    expired = [
+        job_id for job_id, job in analysis_jobs.items()
+        if job.get('finished_at') is not None and job['finished_at'] < cutoff
+    ]
+    for job_id in expired:
+        del analysis_jobs[job_id]
+
+@app.post("/analyze/jobs", status_code=202)
+async def submit_analysis_job(request: TranscriptAnalysisRequest) -> Dict[str, Any]:
+    """
+    Queue a transcript analysis and return immediately with a job id to poll
+    """
+    if not ANALYSIS_JOBS_ENABLED:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis jobs need a single gateway worker; use /analyze instead"
+        )
+    
+    logger.info("Queueing transcript analysis job: %d characters", len(request.transcript))
+    prune_analysis_jobs()
+    
+    job_id = uuid.uuid4().hex
+    try:
+        app.state.analysis_queue.put_nowait((job_id, request.transcript))
+    except asyncio.QueueFull:
+        logger.warning("Analysis job queue full, refusing job")
+        raise HTTPException(status_code=503, detail="Analysis job queue is full, try again later")
+    
+    analysis_jobs[job_id] = {
+        'state': 'queued',
+        'submitted_at': datetime.now().isoformat(),
+        'finished_at': None
+    }
+    
+    return ORJSONResponse(
+        status_code=202,
+        content={
+            'success': True,
+            'job_id': job_id,
+            'state': 'queued',
+            'status_url': f'/analyze/jobs/{job_id}'
+        }
+    )
+
+@app.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str) -> Dict[str, Any]:
+    """
+    Poll a queued transcript analysis for its state and, once finished, its result
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    
+    response = {
+        'success': True,
+        'job_id': job_id,
+        'state': job['state'],
+        'submitted_at': job['submitted_at']
+    }
+    if job['state'] == 'succeeded':
+        response['result'] = job['result']
+    elif job['state'] == 'failed':
+        response['error'] = job['error']
+    
+    return response
+
 @app.post("/update")
 async def update_documents(request: DocumentUpdateRequest) -> Dict[str, Any]:
     """
     Update generated documents based on user feedback
     """
-    logger.info(f"Processing document update: {request.document_type}")
+    logger.info("Processing document update: %s", request.document_type)
     
     try:
-        result = call_incident_processor(
+        result = await call_incident_processor(
             '/update',
             'POST',
+            raw=True,
             json={
                 'feedback': request.feedback,
                 'document_type': request.document_type,
                 'current_content': request.current_content,
-                'all_documents': request.all_documents
+                'all_documents': request.all_documents,
+                'batch_mode': request.batch_mode
             }
         )
         
         if result['success']:
-            return result['data']
+            return Response(
+                content=result['raw_bytes'],
+                media_type=result['content_type'],
+                status_code=result['status_code']
+            )
         else:
             raise HTTPException(
                 status_code=result['status_code'],
-                detail=result['data'].get('error', 'Document update failed')
+                detail=result['data'].get('error', 'Document update failed'),
+                headers=result.get('headers')
             )
             
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Document update error: {e}")
+        logger.error("Document update error: %s", e)
         raise HTTPException(status_code=500, detail="Document update failed")
 
-@app.get("/")
-async def root() -> Dict[str, Any]:
+@app.get("/update/batches/{batch_id}")
+async def get_update_batch(batch_id: str) -> Dict[str, Any]:
+    """
+    Check on a batch-mode document update
+    """
+    try:
+        result = await call_incident_processor(
+            f'/update/batches/{batch_id}',
+            'GET',
+            raw=True
+        )
+        
+        if result['success']:
+            return Response(
+                content=result['raw_bytes'],
+                media_type=result['content_type'],
+                status_code=result['status_code']
+            )
+        else:
+            raise HTTPException(
+                status_code=result['status_code'],
+                detail=result['data'].get('error', 'Update batch lookup failed'),
+                headers=result.get('headers')
+            )
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Update batch lookup error: %s", e)
+        raise HTTPException(status_code=500, detail="Update batch lookup failed")
+
+# Static part of the root endpoint response, built once at import
+ROOT_INFO = {
+    'service': 'Incident Response API Gateway',
+    'description': 'AI-Enhanced Social Care Incident Response System',
+    'version': '1.0.0',
+    'endpoints': {
+        '/health': 'System health check',
+        '/chat': 'Chat about policies or analyze transcripts',
+        '/chat/stream': 'Chat with the answer streamed as server-sent events',
+        '/analyze': 'Direct transcript analysis',
+        '/analyze/jobs': 'Queue a transcript analysis and poll for the result',
+        '/update': 'Update generated documents',
+        '/update/batches/{batch_id}': 'Check a batch-mode document update',
+        '/docs': 'API documentation'
+    },
+    'features': [
+        'Policy-driven incident analysis',
+        'Automated form generation',
+        'Email drafting for required notifications',
+        'Natural language policy Q&A',
+        'Document editing with cross-document consistency'
+    ]
+}
+# Serialized once without its closing brace so each request only appends the timestamp
+ROOT_INFO_PREFIX = orjson.dumps(ROOT_INFO)[:-1]
+
+@app.get("/", response_model=Dict[str, Any])
+async def root() -> Response:
     """
     API Gateway information endpoint
     """
-    return {
-        'service': 'Incident Response API Gateway',
-        'description': 'AI-Enhanced Social Care Incident Response System',
-        'version': '1.0.0',
-        'endpoints': {
-            '/health': 'System health check',
-            '/chat': 'Chat about policies or analyze transcripts',
-            '/analyze': 'Direct transcript analysis',
-            '/update': 'Update generated documents',
-            '/docs': 'API documentation'
-        },
-        'features': [
-            'Policy-driven incident analysis',
-            'Automated form generation',
-            'Email drafting for required notifications',
-            'Natural language policy Q&A',
-            'Document editing with cross-document consistency'
-        ],
-        'timestamp': datetime.now().isoformat()
-    }
+    timestamp = orjson.dumps(datetime.now().isoformat())
+    return Response(content=ROOT_INFO_PREFIX + b',"timestamp":' + timestamp + b'}', media_type='application/json')
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """
     Custom HTTP exception handler with structured error responses
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             'success': False,
             'error': exc.detail,
             'status_code': exc.status_code,
             'timestamp': datetime.now().isoformat()
-        }
+        },
+        headers=exc.headers
     )
 
 if __name__ == '__main__':
@@ -364,4 +794,14 @@ if __name__ == '__main__':
     print("🚀 Gateway running on http://localhost:8000")
     print("📚 API docs available at http://localhost:8000/docs")
     
-    uvicorn.run(app, host='0.0.0.0', port=8000, log_level='info') 
\ No newline at end of file
+    # 'auto' picks uvloop + httptools when installed (not on Windows); scale with WORKERS, DEV=1 enables auto-reload
+    uvicorn.run(
+        'app:app',
+        host='0.0.0.0',
+        port=8000,
+        workers=GATEWAY_WORKERS,
+        loop='auto',
+        http='auto',
+        reload=os.getenv('DEV') == '1',
+        log_level='info'
+    ) 
\ No newline at end of file
@@ -0,0 +1,22 @@
+# Gunicorn configuration for the incident processor
+# Run from this directory with: gunicorn -c gunicorn.conf.py app:app
+
+import multiprocessing
+import os
+
+bind = '0.0.0.0:5001'
+
+# The service is an ASGI app; each uvicorn worker multiplexes many
+# in-flight OpenAI calls on one event loop, so a few workers are plenty.
+# The answer cache, question batcher and analysis coalescing are per process,
+# so extra workers mostly dilute them. Override with WEB_CONCURRENCY.
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = int(os.getenv('WEB_CONCURRENCY', min(multiprocessing.cpu_count(), 4)))
+# Workers inherit this, and split the OpenAI concurrency cap between them
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Transcript analysis can take well over 30s end to end
+timeout = 120
+# Let in-flight analyses and answer streams finish on restart
+graceful_timeout = 60
+keepalive = 5
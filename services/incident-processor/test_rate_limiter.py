@@ -0,0 +1,72 @@
+# Unit tests for the OpenAI rate limiter
+# Run from this directory with: python -m unittest test_rate_limiter
+
+import unittest
+from unittest import mock
+
+from app import OpenAIRateLimiter, OpenAIRateLimited
+
+class RateBudgetTest(unittest.TestCase):
+    def setUp(self):
+        # Freeze the clock so budgets only change when a test moves it
+        self.now = 1000.0
+        patcher = mock.patch('app.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = OpenAIRateLimiter(max_concurrent=1, requests_per_minute=60, tokens_per_minute=600, max_wait=10)
+
+    def test_reserve_within_budget_does_not_wait(self):
+        self.assertEqual(self.limiter._reserve(500), 0)
+        self.assertEqual(self.limiter._request_budget, 59)
+        self.assertEqual(self.limiter._token_budget, 100)
+
+    def test_reserve_over_budget_queues_behind_earlier_reservations(self):
+        self.limiter._reserve(600)
+        # 10 tokens/s refill, so 60 more tokens are covered in 6s
+        self.assertAlmostEqual(self.limiter._reserve(60), 6)
+        self.assertAlmostEqual(self.limiter._token_budget, -60)
+        # The next caller waits for both shortfalls
+        self.assertAlmostEqual(self.limiter._reserve(30), 9)
+
+    def test_reserve_refills_with_time(self):
+        self.limiter._reserve(600)
+        self.now += 30
+        self.assertEqual(self.limiter._reserve(300), 0)
+        self.assertEqual(self.limiter._token_budget, 0)
+
+    def test_reserve_refuses_past_max_wait_without_spending(self):
+        self.limiter._reserve(600)
+        with self.assertRaises(OpenAIRateLimited) as raised:
+            self.limiter._reserve(200)
+        self.assertAlmostEqual(raised.exception.retry_after, 20)
+        self.assertEqual(self.limiter._request_budget, 59)
+        self.assertEqual(self.limiter._token_budget, 0)
+
+    def test_refund_restores_reservation(self):
+        self.limiter._reserve(400)
+        self.limiter._refund(400)
+        self.assertEqual(self.limiter._request_budget, 60)
+        self.assertEqual(self.limiter._token_budget, 600)
+
+class RateLimitTest(unittest.IsolatedAsyncioTestCase):
+    # Real clock here: the event loop's timers run on time.monotonic too
+    def setUp(self):
+        self.limiter = OpenAIRateLimiter(max_concurrent=1, requests_per_minute=60, tokens_per_minute=600, max_wait=10)
+
+    async def test_limit_releases_slot(self):
+        async with self.limiter.limit(100):
+            self.assertTrue(self.limiter._semaphore.locked())
+        self.assertFalse(self.limiter._semaphore.locked())
+        self.assertEqual(self.limiter._token_budget, 500)
+
+    async def test_limit_refunds_when_no_slot_frees_up(self):
+        self.limiter.max_wait = 0
+        await self.limiter._semaphore.acquire()
+        with self.assertRaises(OpenAIRateLimited):
+            async with self.limiter.limit(100):
+                pass
+        self.assertEqual(self.limiter._request_budget, 60)
+        self.assertEqual(self.limiter._token_budget, 600)
+
+if __name__ == '__main__':
+    unittest.main()
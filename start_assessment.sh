@@ -140,7 +140,7 @@ start_service() {
 echo -e "\n${CYAN}STARTING BACKEND SERVICES${NC}"
 
 # Start Incident Processor Service
-start_service "incident-processor" "services/incident-processor" 5001 "http://localhost:5001/health" "python app.py"
+start_service "incident-processor" "services/incident-processor" 5001 "http://localhost:5001/health" "gunicorn -c gunicorn.conf.py app:app"
 
 # Start API Gateway
 start_service "api-gateway" "services/api-gateway" 8000 "http://localhost:8000/health" "python app.py"
@@ -238,6 +238,7 @@ cleanup() {
     
     # Additional cleanup for specific processes
     pkill -f "python.*app.py" 2>/dev/null || true
+    pkill -f "gunicorn.*app:app" 2>/dev/null || true
     pkill -f "react-scripts start" 2>/dev/null || true
     
     echo -e "${GREEN}✅ All services stopped${NC}"